@@ -2,55 +2,192 @@
 
 from __future__ import annotations
 
-import sqlite3
+import asyncio
+import contextlib
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import UTC, datetime
-from pathlib import Path
+from typing import TYPE_CHECKING, Self
 
+import aiosqlite
+
+from local_shazam.config import PROJECT_ROOT
 from local_shazam.logger import get_logger
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable
+    from pathlib import Path
+    from types import TracebackType
+
+# Applied once per connection. The writer also switches the database to WAL, which
+# lets readers proceed during writes; synchronous=NORMAL is crash-safe under WAL
+# while skipping the per-commit fsync.
+_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Writes are queued and committed together: a batch is flushed once it reaches
+# _FLUSH_MAX_ROWS or _FLUSH_INTERVAL_S after its first row, whichever is first.
+_FLUSH_INTERVAL_S = 0.05
+_FLUSH_MAX_ROWS = 64
+
+# Most recently used descriptions kept in memory in front of SQLite
+_MEMORY_CACHE_SIZE = 256
+
+# How often the WAL is checkpointed and truncated so it can't grow unbounded
+_CHECKPOINT_INTERVAL_S = 60.0
+
+# Kept as constants so every call passes the identical SQL text and hits the
+# per-connection prepared statement cache instead of re-parsing the query.
+_SELECT_SQL = "SELECT description FROM aesthetics WHERE artist = ? AND song = ?"
+_INSERT_SQL = """
+    INSERT OR REPLACE INTO aesthetics (artist, song, description, created_at)
+    VALUES (?, ?, ?, ?)
+"""
 
 log = get_logger(__name__)
 
 
+async def _connect(db_path: Path, *pragmas: str) -> aiosqlite.Connection:
+    """Open an autocommit connection and apply the shared PRAGMAs."""
+    conn = await aiosqlite.connect(db_path, isolation_level=None)
+    for pragma in (*pragmas, *_PRAGMAS):
+        await conn.execute(pragma)
+    return conn
+
+
+class _ReadPool:
+    """Bounded pool of read-only connections."""
+
+    def __init__(self, conns: list[aiosqlite.Connection]) -> None:
+        self._conns = conns
+        self._available = asyncio.Semaphore(len(conns))
+
+    @classmethod
+    async def open(cls, db_path: Path, size: int) -> _ReadPool:
+        conns = [await _connect(db_path, "PRAGMA query_only=1") for _ in range(size)]
+        return cls(conns)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection, waiting if all are in use."""
+        async with self._available:
+            conn = self._conns.pop()
+            try:
+                yield conn
+            finally:
+                self._conns.append(conn)
+
+    async def close(self) -> None:
+        for conn in self._conns:
+            await conn.close()
+        self._conns.clear()
+
+
 class AestheticCache:
     """SQLite cache for artist/song visual aesthetics.
 
     Stores full aesthetic descriptions keyed by normalized (artist, song) pairs.
-    Thread-safe for read operations; writes use SQLite's built-in locking.
+    Uses long-lived aiosqlite connections, so queries run on background threads
+    and never block the event loop: a single writer plus a pool of read-only
+    connections, which WAL lets run concurrently with the writer. Recently used
+    descriptions are also kept in an in-memory LRU in front of SQLite. Writes are
+    queued and committed in batches by a background task, and another task
+    periodically checkpoints the WAL. Call `open()` before use and `close()` on
+    shutdown, or use the cache as an async context manager.
     """
 
-    def __init__(self, db_path: Path | None = None) -> None:
+    def __init__(
+        self,
+        db_path: Path | None = None,
+        read_pool_size: int | None = None,
+        memory_size: int = _MEMORY_CACHE_SIZE,
+    ) -> None:
         """Initialize the cache.
 
         Args:
             db_path: Path to SQLite database file. Defaults to data/aesthetic_cache.db.
+            read_pool_size: Number of read connections. Defaults to the CPU count.
+            memory_size: Maximum number of descriptions kept in memory.
         """
         self._db_path = db_path or (PROJECT_ROOT / "data" / "aesthetic_cache.db")
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
-
-    def _init_db(self) -> None:
-        """Create the aesthetics table if it doesn't exist."""
-        with sqlite3.connect(self._db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS aesthetics (
-                    artist TEXT NOT NULL,
-                    song TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    PRIMARY KEY (artist, song)
-                )
-            """)
-            conn.commit()
+        self._read_pool_size = read_pool_size or os.cpu_count() or 1
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._write_queue: asyncio.Queue[tuple[str, str, str, str]] = asyncio.Queue()
+        self._write_task: asyncio.Task[None] | None = None
+        self._checkpoint_task: asyncio.Task[None] | None = None
+        self._readers: _ReadPool | None = None
+        self._inflight: dict[tuple[str, str], asyncio.Task[str]] = {}
+        self._memory: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._memory_size = memory_size
+
+    async def __aenter__(self) -> Self:
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Open the database connections and create the schema if needed."""
+        self._writer = await _connect(self._db_path, "PRAGMA journal_mode=WAL")
+        await self._writer.execute("""
+            CREATE TABLE IF NOT EXISTS aesthetics (
+                artist TEXT NOT NULL,
+                song TEXT NOT NULL,
+                description TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (artist, song)
+            )
+        """)
+        self._readers = await _ReadPool.open(self._db_path, self._read_pool_size)
+        self._write_task = asyncio.create_task(self._write_loop())
+        self._checkpoint_task = asyncio.create_task(self._checkpoint_loop())
         log.info("aesthetic cache initialized at %s", self._db_path)
 
+    async def close(self) -> None:
+        """Flush queued writes and close all database connections."""
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._checkpoint_task
+            self._checkpoint_task = None
+        if self._write_task is not None:
+            await self.flush()
+            self._write_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._write_task
+            self._write_task = None
+        if self._readers is not None:
+            await self._readers.close()
+            self._readers = None
+        if self._writer is not None:
+            await self._writer.close()
+            self._writer = None
+
+    def _open_pools(self) -> tuple[aiosqlite.Connection, _ReadPool]:
+        if self._writer is None or self._readers is None:
+            raise RuntimeError("AestheticCache is not open")
+        return self._writer, self._readers
+
     @staticmethod
     def _normalize(value: str) -> str:
         """Normalize artist/song names for consistent lookups."""
         return value.strip().lower()
 
-    def get(self, artist: str, song: str) -> str | None:
+    async def get(self, artist: str, song: str) -> str | None:
         """Lookup cached aesthetic description.
 
         Args:
@@ -63,23 +200,98 @@ class AestheticCache:
         artist_norm = self._normalize(artist)
         song_norm = self._normalize(song)
 
-        with sqlite3.connect(self._db_path) as conn:
-            cursor = conn.execute(
-                "SELECT description FROM aesthetics WHERE artist = ? AND song = ?",
-                (artist_norm, song_norm),
-            )
-            row = cursor.fetchone()
+        key = (artist_norm, song_norm)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            log.info("cache hit (memory): '%s' by %s", song, artist)
+            return self._memory[key]
+
+        _, readers = self._open_pools()
+        async with (
+            readers.acquire() as conn,
+            conn.execute(_SELECT_SQL, key) as cursor,
+        ):
+            row = await cursor.fetchone()
 
         if row:
             log.info("cache hit: '%s' by %s", song, artist)
             result: str = row[0]
+            self._remember(key, result)
             return result
 
         log.info("cache miss: '%s' by %s", song, artist)
         return None
 
-    def put(self, artist: str, song: str, description: str) -> None:
-        """Store aesthetic description in cache.
+    async def get_or_fetch(
+        self,
+        artist: str,
+        song: str,
+        fetch: Callable[[], Awaitable[str]],
+        *,
+        should_cache: Callable[[str], bool] = lambda _: True,
+    ) -> str:
+        """Lookup a cached description, fetching and caching it on a miss.
+
+        Concurrent misses for the same (artist, song) share a single `fetch`
+        call, and the fetch keeps running if the caller that started it is
+        cancelled.
+
+        Args:
+            artist: Artist name.
+            song: Song title.
+            fetch: Coroutine factory producing the description on a miss.
+            should_cache: Whether a fetched description should be stored.
+
+        Returns:
+            The cached or freshly fetched description.
+        """
+        # Register before any await so that concurrent callers can't each miss
+        # and then each start a fetch
+        key = (self._normalize(artist), self._normalize(song))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._get_or_fetch(artist, song, fetch, should_cache)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+        else:
+            log.info("joining in-flight lookup: '%s' by %s", song, artist)
+        return await asyncio.shield(task)
+
+    def _finish_inflight(self, key: tuple[str, str], task: asyncio.Task[str]) -> None:
+        """Drop a finished lookup and mark its exception as retrieved.
+
+        If every caller was cancelled, nobody awaits the shielded task, and an
+        unread exception would be reported as "never retrieved".
+        """
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _get_or_fetch(
+        self,
+        artist: str,
+        song: str,
+        fetch: Callable[[], Awaitable[str]],
+        should_cache: Callable[[str], bool],
+    ) -> str:
+        """Look up a description, running the fetch and queueing it on a miss."""
+        cached = await self.get(artist, song)
+        if cached is not None:
+            return cached
+
+        description = await fetch()
+        if should_cache(description):
+            await self.put(artist, song, description)
+        return description
+
+    async def put(self, artist: str, song: str, description: str) -> None:
+        """Queue an aesthetic description to be stored in the cache.
+
+        Returns immediately. The description is visible to `get()` right away
+        through the in-memory LRU; the row is committed by the background
+        writer shortly afterwards. Use `flush()` to wait for it.
 
         Args:
             artist: Artist name.
@@ -90,14 +302,88 @@ class AestheticCache:
         song_norm = self._normalize(song)
         now = datetime.now(UTC).isoformat()
 
-        with sqlite3.connect(self._db_path) as conn:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO aesthetics (artist, song, description, created_at)
-                VALUES (?, ?, ?, ?)
-                """,
-                (artist_norm, song_norm, description, now),
-            )
-            conn.commit()
+        if self._write_task is None:
+            raise RuntimeError("AestheticCache is not open")
+        self._remember((artist_norm, song_norm), description)
+        self._write_queue.put_nowait((artist_norm, song_norm, description, now))
+        log.info("queued aesthetic: '%s' by %s", song, artist)
+
+    def _remember(self, key: tuple[str, str], description: str) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry if full."""
+        self._memory[key] = description
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    async def flush(self) -> None:
+        """Wait until every queued write has been committed."""
+        await self._write_queue.join()
+
+    async def _write_loop(self) -> None:
+        """Commit queued writes in batches until cancelled."""
+        while True:
+            batch = [await self._write_queue.get()]
+            deadline = asyncio.get_running_loop().time() + _FLUSH_INTERVAL_S
+            with contextlib.suppress(TimeoutError):
+                async with asyncio.timeout_at(deadline):
+                    while len(batch) < _FLUSH_MAX_ROWS:
+                        batch.append(await self._write_queue.get())
+            try:
+                await self._write_batch(batch)
+            except Exception:
+                log.exception("failed to cache %d aesthetics", len(batch))
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
 
-        log.info("cached aesthetic: '%s' by %s", song, artist)
+    async def _write_batch(self, rows: list[tuple[str, str, str, str]]) -> None:
+        """Insert rows in a single write transaction."""
+        writer, _ = self._open_pools()
+        async with self._write_lock:
+            await writer.execute("BEGIN IMMEDIATE")
+            try:
+                await writer.executemany(_INSERT_SQL, rows)
+            except BaseException:
+                await writer.execute("ROLLBACK")
+                raise
+            await writer.execute("COMMIT")
+        log.info("cached %d aesthetics", len(rows))
+
+    async def checkpoint(self) -> tuple[int, int, int]:
+        """Checkpoint the WAL into the database file and truncate it.
+
+        Returns:
+            SQLite's (busy, log_pages, checkpointed_pages) result; busy is 1 if
+            readers prevented the checkpoint from completing.
+        """
+        writer, _ = self._open_pools()
+        async with (
+            self._write_lock,
+            writer.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cursor,
+        ):
+            row = await cursor.fetchone()
+        if row is None:
+            raise RuntimeError("wal_checkpoint returned no result")
+        busy, log_pages, checkpointed = row
+        return busy, log_pages, checkpointed
+
+    async def _checkpoint_loop(self) -> None:
+        """Checkpoint the WAL every _CHECKPOINT_INTERVAL_S until cancelled."""
+        while True:
+            await asyncio.sleep(_CHECKPOINT_INTERVAL_S)
+            # Writes are about to land anyway; try again next interval
+            if not self._write_queue.empty():
+                continue
+            try:
+                busy, log_pages, checkpointed = await self.checkpoint()
+            except Exception:
+                log.exception("WAL checkpoint failed")
+                continue
+            if busy:
+                log.warning(
+                    "WAL checkpoint incomplete: %d of %d pages checkpointed",
+                    checkpointed,
+                    log_pages,
+                )
+            else:
+                log.debug("WAL checkpoint: %d pages checkpointed", checkpointed)
@@ -3,27 +3,62 @@
 from __future__ import annotations
 
 from io import BytesIO
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO
 from uuid import UUID  # noqa: TC003 - needed at runtime for FastAPI/Pydantic
 
+import anyio
 from fastapi import APIRouter, HTTPException, Query, Request, UploadFile
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, Response
 from PIL import Image
 
 from local_shazam.exceptions import ServiceError
-from local_shazam.image_transformer import transform_image
-from local_shazam.openai_client import OpenAIClient
+from local_shazam.image_transformer import lookup_aesthetic, transform_image
 
 _MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
+_UPLOAD_CHUNK_SIZE = 64 * 1024
 
 if TYPE_CHECKING:
     from local_shazam.aesthetic_cache import AestheticCache
     from local_shazam.config import Settings
+    from local_shazam.flux2_client import Flux2Client
+    from local_shazam.openai_client import OpenAIClient
     from local_shazam.process_images import ImageStore
 
 router = APIRouter()
 
 
+def _verify_image(data: BinaryIO) -> None:
+    """Check that data is a well-formed image file without decoding its pixels.
+
+    The file is read from its start and left where verification stopped.
+
+    Raises:
+        Exception: Any PIL error if the data isn't a readable image.
+    """
+    data.seek(0)
+    with Image.open(data) as img:
+        img.verify()
+
+
+def _if_none_match(value: str | None, etag: str) -> bool:
+    """Check whether an If-None-Match header matches an entity tag.
+
+    Weak validators are treated as strong, bare tags are quoted, and ``*``
+    matches any current representation (RFC 9110, section 13.1.2).
+    """
+    if not value:
+        return False
+    if value.strip() == "*":
+        return True
+    for raw_tag in value.split(","):
+        tag = raw_tag.strip().removeprefix("W/")
+        if tag and not tag.startswith('"'):
+            tag = f'"{tag}"'
+        if tag == etag:
+            return True
+    return False
+
+
 @router.get("/health")
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
@@ -34,7 +69,9 @@ async def health_check() -> dict[str, str]:
 async def upload_image(request: Request, file: UploadFile) -> dict[str, str]:
     """Upload an image to the store.
 
-    The image will be analyzed with GPT-4o and saved with its description.
+    The image ID is returned as soon as the original is saved. GPT-4o analysis
+    continues in the background, and the image is served and transformable
+    once its description is stored.
 
     Args:
         request: FastAPI request (provides access to app state).
@@ -45,19 +82,31 @@ async def upload_image(request: Request, file: UploadFile) -> dict[str, str]:
     """
     image_store: ImageStore = request.app.state.image_store
 
-    contents = await file.read()
-    if len(contents) > _MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Maximum size is {_MAX_UPLOAD_SIZE // 1024 // 1024} MB",
-        )
-
+    # Read in chunks so oversized uploads are rejected without buffering them whole
+    buf = BytesIO()
+    total = 0
+    while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > _MAX_UPLOAD_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {_MAX_UPLOAD_SIZE // 1024 // 1024} MB",
+            )
+        buf.write(chunk)
+
+    # The buffer itself is handed on, so the upload is never copied whole
     try:
-        img = Image.open(BytesIO(contents))
+        await anyio.to_thread.run_sync(_verify_image, buf)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid image: {e}") from e
 
-    image_id = await image_store.put_image(img)
+    # verify() only parses headers, so a truncated or corrupt body still
+    # fails here, when the pixels are first decoded
+    buf.seek(0)
+    try:
+        image_id = await image_store.put_image_bytes(buf)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}") from e
     return {"image_id": str(image_id)}
 
 
@@ -65,6 +114,9 @@ async def upload_image(request: Request, file: UploadFile) -> dict[str, str]:
 async def get_random_image(request: Request) -> Response:
     """Return a random image.
 
+    The image UUID doubles as its ETag. If the client already holds the picked
+    image (If-None-Match matches), a bodyless 304 is returned instead.
+
     Args:
         request: FastAPI request (provides access to app state).
 
@@ -72,20 +124,19 @@ async def get_random_image(request: Request) -> Response:
         JPEG image bytes with X-Image-ID header containing the image UUID.
     """
     image_store: ImageStore = request.app.state.image_store
-    result = image_store.get_random_image()
+    result = image_store.get_random_image_path()
 
     if result is None:
         raise HTTPException(status_code=404, detail="No images available")
 
-    image_id, img = result
-    buf = BytesIO()
-    img.save(buf, format="JPEG", quality=90)
+    image_id, path = result
+    etag = f'"{image_id}"'
+    headers = {"X-Image-ID": str(image_id), "ETag": etag, "Cache-Control": "no-cache"}
+    if _if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
 
-    return Response(
-        content=buf.getvalue(),
-        media_type="image/jpeg",
-        headers={"X-Image-ID": str(image_id)},
-    )
+    # The stored JPEG is served straight from disk, with no decode or re-encode
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
 
 
 @router.post("/images")
@@ -109,11 +160,20 @@ async def transform_image_endpoint(
     image_store: ImageStore = request.app.state.image_store
     settings: Settings = request.app.state.settings
     aesthetic_cache: AestheticCache = request.app.state.aesthetic_cache
+    flux_client: Flux2Client = request.app.state.flux_client
+    openai_client: OpenAIClient = request.app.state.openai_client
+
+    if image_store.is_pending(image_id):
+        raise HTTPException(status_code=409, detail="Image is still being analyzed")
+    failure = image_store.get_failure(image_id)
+    if failure is not None:
+        raise HTTPException(status_code=502, detail=f"Image analysis failed: {failure}")
 
     try:
         image_path = image_store.get_image_path(image_id)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
+    description = await image_store.get_description(image_id)
 
     try:
         png_bytes = await transform_image(
@@ -122,6 +182,9 @@ async def transform_image_endpoint(
             artist_name=song_artists,
             settings=settings,
             aesthetic_cache=aesthetic_cache,
+            flux_client=flux_client,
+            openai_client=openai_client,
+            description=description,
         )
     except ServiceError as e:
         raise HTTPException(status_code=502, detail=str(e)) from e
@@ -145,17 +208,12 @@ async def get_aesthetic(
     Returns:
         JSON with the aesthetic description.
     """
-    settings: Settings = request.app.state.settings
+    client: OpenAIClient = request.app.state.openai_client
     cache: AestheticCache = request.app.state.aesthetic_cache
 
-    aesthetic = cache.get(artist, song_title)
-    if aesthetic is None:
-        try:
-            client = OpenAIClient(settings.openai_api_key)
-            aesthetic = await client.search_aesthetic(artist, song_title)
-        except ServiceError as e:
-            raise HTTPException(status_code=502, detail=str(e)) from e
-        if "No visual data found" not in aesthetic:
-            cache.put(artist, song_title, aesthetic)
+    try:
+        aesthetic = await lookup_aesthetic(client, cache, artist, song_title)
+    except ServiceError as e:
+        raise HTTPException(status_code=502, detail=str(e)) from e
 
     return {"aesthetic": aesthetic}
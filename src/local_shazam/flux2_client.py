@@ -1,21 +1,74 @@
 """BFL (Black Forest Labs) API client for Flux.2 image generation."""
 
+import math
+from types import TracebackType
+from typing import Self
+
 import anyio
 import httpx
 
 from local_shazam.exceptions import ServiceError
 
 _BASE_URL = "https://api.bfl.ai"
-_POLL_INTERVAL_S = 0.5
+# Poll quickly at first so fast jobs return promptly, then back off so long
+# jobs don't flood the API with status requests.
+_POLL_INITIAL_DELAY_S = 0.1
+_POLL_MAX_DELAY_S = 2.0
+_POLL_BACKOFF_FACTOR = 1.5
 _POLL_TIMEOUT_S = 120.0
 
 
+def _retry_after(response: httpx.Response) -> float | None:
+    """Return the server-requested poll delay in seconds, if one was sent.
+
+    The server's delay is a floor on the local backoff, never a way to poll
+    sooner, and is capped at the poll timeout.
+    Unparseable (including HTTP-date), non-finite and negative values are
+    ignored.
+    """
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(seconds) or seconds < 0:
+        return None
+    return min(seconds, _POLL_TIMEOUT_S)
+
+
 class Flux2Client:
-    """Async client for the BFL Flux.2 API."""
+    """Async client for the BFL Flux.2 API.
+
+    Holds one pooled HTTP/2 connection set for its lifetime, so repeated
+    generations and polls skip the TCP/TLS handshake. Call `aclose()` when done,
+    or use the client as an async context manager.
+    """
 
     def __init__(self, api_key: str, timeout: float = 30.0) -> None:
         self._api_key = api_key
-        self._timeout = timeout
+        self._client = httpx.AsyncClient(
+            base_url=_BASE_URL,
+            timeout=timeout,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._client.aclose()
 
     async def generate_image(self, prompt: str, input_image_b64: str) -> bytes:
         """Submit an image edit job and return the result.
@@ -37,25 +90,22 @@ class Flux2Client:
             "output_format": "png",
         }
 
-        async with httpx.AsyncClient(
-            base_url=_BASE_URL, timeout=self._timeout
-        ) as client:
-            response = await client.post(
-                "/v1/flux-2-klein-9b",
-                headers=headers,
-                json=payload,
-            )
-            self._check_response(response)
+        response = await self._client.post(
+            "/v1/flux-2-klein-9b",
+            headers=headers,
+            json=payload,
+        )
+        self._check_response(response)
 
-            polling_url = response.json().get("polling_url")
-            if not polling_url:
-                raise ServiceError(f"No polling_url in BFL response: {response.json()}")
+        polling_url = response.json().get("polling_url")
+        if not polling_url:
+            raise ServiceError(f"No polling_url in BFL response: {response.json()}")
 
-            image_url = await self._poll_for_result(client, polling_url)
+        image_url = await self._poll_for_result(polling_url)
 
-            image_response = await client.get(image_url)
-            image_response.raise_for_status()
-            return image_response.content
+        image_response = await self._client.get(image_url)
+        image_response.raise_for_status()
+        return image_response.content
 
     def _check_response(self, response: httpx.Response) -> None:
         """Check response status and raise appropriate errors."""
@@ -65,15 +115,12 @@ class Flux2Client:
             raise ServiceError("BFL rate limit exceeded")
         response.raise_for_status()
 
-    async def _poll_for_result(
-        self,
-        client: httpx.AsyncClient,
-        polling_url: str,
-    ) -> str:
+    async def _poll_for_result(self, polling_url: str) -> str:
         """Poll until generation is ready and return the image URL."""
+        delay = _POLL_INITIAL_DELAY_S
         start_time = anyio.current_time()
         while (anyio.current_time() - start_time) < _POLL_TIMEOUT_S:
-            response = await client.get(polling_url)
+            response = await self._client.get(polling_url)
             response.raise_for_status()
             data = response.json()
 
@@ -87,6 +134,8 @@ class Flux2Client:
             if status in ("Failed", "Error"):
                 raise ServiceError(f"Flux.2 generation failed: {data}")
 
-            await anyio.sleep(_POLL_INTERVAL_S)
+            retry_after = _retry_after(response)
+            await anyio.sleep(delay if retry_after is None else max(delay, retry_after))
+            delay = min(_POLL_MAX_DELAY_S, delay * _POLL_BACKOFF_FACTOR)
 
         raise ServiceError(f"Flux.2 polling timed out after {_POLL_TIMEOUT_S}s")
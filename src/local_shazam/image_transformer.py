@@ -1,9 +1,11 @@
 """Image transformation using GPT-4o analysis + Flux.2 Klein 9B editing."""
 
-import base64
+from contextlib import AsyncExitStack
+from io import BytesIO
 from pathlib import Path
 
 import anyio
+import pybase64
 from PIL import Image
 from PIL.ExifTags import GPS, IFD
 
@@ -14,6 +16,19 @@ from local_shazam.flux2_client import Flux2Client
 from local_shazam.openai_client import OpenAIClient
 from local_shazam.prompts import load_prompt
 
+# EXIF tag IDs, resolved once instead of through the PIL.ExifTags enums per call
+_IMAGE_DESCRIPTION = 270
+_MAKE = 271
+_MODEL = 272
+_DATETIME = 306
+_DATETIME_ORIGINAL = 36867
+_EXIF_IFD = int(IFD.Exif)
+_GPS_IFD = int(IFD.GPSInfo)
+_GPS_LATITUDE_REF = int(GPS.GPSLatitudeRef)
+_GPS_LATITUDE = int(GPS.GPSLatitude)
+_GPS_LONGITUDE_REF = int(GPS.GPSLongitudeRef)
+_GPS_LONGITUDE = int(GPS.GPSLongitude)
+
 
 def _convert_gps_to_decimal(
     coords: tuple[float, float, float],
@@ -27,11 +42,16 @@ def _convert_gps_to_decimal(
     return decimal
 
 
-def _extract_image_metadata(image_path: Path) -> dict[str, str | None]:
-    """Extract EXIF metadata from an image file.
+def _encode_base64(data: bytes) -> str:
+    """Base64-encode bytes to an ASCII string."""
+    return pybase64.b64encode_as_string(data)
+
+
+def _extract_image_metadata(image_data: bytes) -> dict[str, str | None]:
+    """Extract EXIF metadata from encoded image bytes.
 
     Args:
-        image_path: Path to the image file.
+        image_data: Contents of the image file.
 
     Returns:
         Dictionary containing extracted metadata fields.
@@ -44,32 +64,28 @@ def _extract_image_metadata(image_path: Path) -> dict[str, str | None]:
         "gps_coords": None,
     }
 
-    with Image.open(image_path) as img:
+    with Image.open(BytesIO(image_data)) as img:
         exif = img.getexif()
         if not exif:
             return metadata
 
-        # ImageDescription (tag 270)
-        metadata["description"] = exif.get(270)
-
-        # DateTime (tag 306) or DateTimeOriginal (tag 36867 in EXIF IFD)
-        metadata["datetime"] = exif.get(306)
-        if not metadata["datetime"]:
-            exif_ifd = exif.get_ifd(IFD.Exif)
-            if exif_ifd:
-                metadata["datetime"] = exif_ifd.get(36867)
+        metadata["description"] = exif.get(_IMAGE_DESCRIPTION)
+        metadata["camera_make"] = exif.get(_MAKE)
+        metadata["camera_model"] = exif.get(_MODEL)
 
-        # Camera Make (tag 271) and Model (tag 272)
-        metadata["camera_make"] = exif.get(271)
-        metadata["camera_model"] = exif.get(272)
+        # DateTime, falling back to DateTimeOriginal in the EXIF IFD. Sub-IFDs are
+        # only decoded when their pointer tag is present.
+        metadata["datetime"] = exif.get(_DATETIME)
+        if not metadata["datetime"] and _EXIF_IFD in exif:
+            metadata["datetime"] = exif.get_ifd(_EXIF_IFD).get(_DATETIME_ORIGINAL)
 
         # GPS coordinates
-        gps_ifd = exif.get_ifd(IFD.GPSInfo)
-        if gps_ifd:
-            lat = gps_ifd.get(GPS.GPSLatitude)
-            lat_ref = gps_ifd.get(GPS.GPSLatitudeRef)
-            lon = gps_ifd.get(GPS.GPSLongitude)
-            lon_ref = gps_ifd.get(GPS.GPSLongitudeRef)
+        if _GPS_IFD in exif:
+            gps_ifd = exif.get_ifd(_GPS_IFD)
+            lat = gps_ifd.get(_GPS_LATITUDE)
+            lat_ref = gps_ifd.get(_GPS_LATITUDE_REF)
+            lon = gps_ifd.get(_GPS_LONGITUDE)
+            lon_ref = gps_ifd.get(_GPS_LONGITUDE_REF)
 
             if lat and lat_ref and lon and lon_ref:
                 lat_decimal = _convert_gps_to_decimal(lat, lat_ref)
@@ -79,28 +95,56 @@ def _extract_image_metadata(image_path: Path) -> dict[str, str | None]:
     return metadata
 
 
+async def lookup_aesthetic(
+    client: OpenAIClient,
+    cache: AestheticCache,
+    artist_name: str,
+    song_name: str,
+) -> str:
+    """Return a song's visual aesthetic, searching the web on a cache miss.
+
+    Concurrent lookups for the same song share one web search. Results the
+    search could not find anything for are not cached.
+
+    Args:
+        client: OpenAI client used for the web search.
+        cache: Aesthetic cache.
+        artist_name: Name of the artist.
+        song_name: Name of the song.
+
+    Returns:
+        The aesthetic description.
+
+    Raises:
+        ServiceError: If the web search fails.
+    """
+    return await cache.get_or_fetch(
+        artist_name,
+        song_name,
+        lambda: client.search_aesthetic(artist_name, song_name),
+        should_cache=lambda aesthetic: "No visual data found" not in aesthetic,
+    )
+
+
 async def _generate_flux_prompt(
     client: OpenAIClient,
     cache: AestheticCache,
-    image_path: Path,
+    image_bytes: bytes,
     song_name: str,
     artist_name: str,
+    description: str | None = None,
 ) -> str:
     """Use GPT-4o with image metadata and cached aesthetics to generate a Flux.2 prompt."""
-    # Check cache first, search web on miss
-    aesthetic = cache.get(artist_name, song_name)
-    if aesthetic is None:
-        aesthetic = await client.search_aesthetic(artist_name, song_name)
-        if "No visual data found" not in aesthetic:
-            cache.put(artist_name, song_name, aesthetic)
+    aesthetic = await lookup_aesthetic(client, cache, artist_name, song_name)
 
-    metadata = _extract_image_metadata(image_path)
+    metadata = await anyio.to_thread.run_sync(_extract_image_metadata, image_bytes)
 
     # Build context from available metadata
     context_parts = []
 
-    if metadata["description"]:
-        context_parts.append(f"Description: {metadata['description']}")
+    description = description or metadata["description"]
+    if description:
+        context_parts.append(f"Description: {description}")
 
     if metadata["gps_coords"]:
         context_parts.append(f"GPS Coordinates: {metadata['gps_coords']}")
@@ -138,6 +182,9 @@ async def transform_image(
     artist_name: str,
     settings: Settings | None = None,
     aesthetic_cache: AestheticCache | None = None,
+    flux_client: Flux2Client | None = None,
+    openai_client: OpenAIClient | None = None,
+    description: str | None = None,
 ) -> bytes:
     """Transform an image to match a song's vibe using GPT-4o + Flux.2.
 
@@ -152,6 +199,10 @@ async def transform_image(
         artist_name: Name of the artist.
         settings: Optional settings instance. Created if not provided.
         aesthetic_cache: Optional cache instance. Created if not provided.
+        flux_client: Optional shared Flux.2 client. Created if not provided.
+        openai_client: Optional shared OpenAI client. Created if not provided.
+        description: Optional stored description of the image. Falls back to
+            the EXIF ImageDescription tag if not provided.
 
     Returns:
         The transformed image as PNG bytes.
@@ -165,21 +216,36 @@ async def transform_image(
     if settings is None:
         settings = Settings()
 
-    if aesthetic_cache is None:
-        aesthetic_cache = AestheticCache()
-
     if not settings.bfl_api_key:
         raise ServiceError("BFL_API_KEY not configured")
     if not settings.openai_api_key:
         raise ServiceError("OPENAI_API_KEY not configured")
 
-    openai_client = OpenAIClient(settings.openai_api_key)
-    flux_prompt = await _generate_flux_prompt(
-        openai_client, aesthetic_cache, image_path, song_name, artist_name
-    )
-
-    image_bytes = await anyio.Path(image_path).read_bytes()
-    image_b64 = base64.b64encode(image_bytes).decode("utf-8")
-
-    flux_client = Flux2Client(settings.bfl_api_key)
-    return await flux_client.generate_image(flux_prompt, image_b64)
+    async with AsyncExitStack() as stack:
+        if aesthetic_cache is None:
+            aesthetic_cache = await stack.enter_async_context(AestheticCache())
+        if flux_client is None:
+            flux_client = await stack.enter_async_context(
+                Flux2Client(settings.bfl_api_key)
+            )
+        if openai_client is None:
+            openai_client = await stack.enter_async_context(
+                OpenAIClient(settings.openai_api_key)
+            )
+
+        # Read the file once; the bytes feed both EXIF parsing and the upload
+        image_bytes = await anyio.Path(image_path).read_bytes()
+        flux_prompt = await _generate_flux_prompt(
+            openai_client,
+            aesthetic_cache,
+            image_bytes,
+            song_name,
+            artist_name,
+            description,
+        )
+
+        # BFL only accepts the input image as a base64 string inside the JSON body,
+        # so encode it on a worker thread to keep the event loop responsive.
+        image_b64 = await anyio.to_thread.run_sync(_encode_base64, image_bytes)
+
+        return await flux_client.generate_image(flux_prompt, image_b64)
@@ -1,15 +1,20 @@
 """OpenAI API client for GPT-4o vision and chat completions."""
 
-from typing import TYPE_CHECKING, Any
+import json
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 from local_shazam.exceptions import ServiceError
 from local_shazam.logger import get_logger
 from local_shazam.prompts import load_prompt
 
 if TYPE_CHECKING:
-    from openai.types.chat import ChatCompletionMessageParam
+    from openai.types.chat import (
+        ChatCompletionContentPartParam,
+        ChatCompletionMessageParam,
+    )
 
 log = get_logger(__name__)
 
@@ -17,10 +22,35 @@ type ContentBlock = dict[str, Any]
 
 
 class OpenAIClient:
-    """Async client for OpenAI GPT-4o vision and chat APIs."""
+    """Async client for OpenAI GPT-4o vision and chat APIs.
+
+    Create one instance and reuse it: it holds one pooled HTTP/2 connection set
+    for its lifetime, so repeated calls skip the TCP/TLS handshake. Call
+    `aclose()` when done, or use the client as an async context manager.
+    """
 
     def __init__(self, api_key: str, timeout: float = 60.0) -> None:
-        self._client = AsyncOpenAI(api_key=api_key, timeout=timeout)
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=timeout,
+            # Keeps the SDK's default pool limits and redirect handling
+            http_client=DefaultAsyncHttpxClient(http2=True),
+        )
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._client.close()
 
     async def describe_image(
         self,
@@ -78,6 +108,78 @@ class OpenAIClient:
         )
         return result
 
+    async def describe_images(
+        self,
+        images_b64: list[str],
+        prompt: str,
+        *,
+        max_tokens: int = 800,
+        mime_type: str = "image/jpeg",
+    ) -> list[str]:
+        """Describe several images in a single GPT-4o vision request.
+
+        One request amortizes the round trip and the prompt tokens over the
+        batch. The model is asked for a JSON object with one description per
+        image, in order.
+
+        Args:
+            images_b64: Base64-encoded image data, one entry per image.
+            prompt: Per-image instructions, as for `describe_image`.
+            max_tokens: Maximum tokens per image; the request allows this many
+                for each image in the batch.
+            mime_type: MIME type of the images.
+
+        Returns:
+            One description per input image, in the same order.
+
+        Raises:
+            ServiceError: If the API call fails or the response doesn't hold
+                exactly one description per image.
+        """
+        count = len(images_b64)
+        content: list[ChatCompletionContentPartParam] = []
+        for i, image_b64 in enumerate(images_b64, start=1):
+            content.append({"type": "text", "text": f"Image {i}:"})
+            content.append(
+                {
+                    "type": "image_url",
+                    "image_url": {"url": f"data:{mime_type};base64,{image_b64}"},
+                }
+            )
+        batch_prompt = load_prompt("describe_image_batch").format(count=count)
+        content.append({"type": "text", "text": f"{prompt}\n\n{batch_prompt}"})
+        log.info(
+            "describe_images request: prompt=%r, images=%d, total_size=%d",
+            prompt[:100],
+            count,
+            sum(len(image_b64) for image_b64 in images_b64),
+        )
+
+        response = await self._client.chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": content}],
+            max_tokens=max_tokens * count,
+            response_format={"type": "json_object"},
+        )
+
+        raw = response.choices[0].message.content
+        if not raw:
+            raise ServiceError("GPT-4o returned empty response")
+        try:
+            descriptions = json.loads(raw)["descriptions"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ServiceError(f"GPT-4o returned malformed batch: {e}") from e
+        if (
+            not isinstance(descriptions, list)
+            or len(descriptions) != count
+            or not all(isinstance(d, str) and d.strip() for d in descriptions)
+        ):
+            raise ServiceError(f"GPT-4o returned a malformed batch for {count} images")
+
+        results = [d.strip() for d in descriptions]
+        log.info("describe_images response: %d descriptions", len(results))
+        return results
+
     async def chat(
         self,
         system_prompt: str,
@@ -2,133 +2,549 @@
 
 from __future__ import annotations
 
-import base64
+import asyncio
+import os
 import random
+import shutil
 import uuid
+from datetime import UTC, datetime
 from io import BytesIO
-from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, BinaryIO
 
-from PIL import Image, ImageOps
+import aiosqlite
+import anyio
+import openai
+import pybase64
+from PIL import Image, ImageOps, features
 from PIL.Image import Resampling
 
+from local_shazam.config import PROJECT_ROOT
+from local_shazam.exceptions import ServiceError
 from local_shazam.logger import get_logger
 from local_shazam.openai_client import OpenAIClient
 from local_shazam.prompts import load_prompt
 
 if TYPE_CHECKING:
+    from pathlib import Path
     from uuid import UUID
 
     from local_shazam.config import Settings
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-EXTENSIONS = {".jpg", ".jpeg", ".png"}
-
 log = get_logger(__name__)
 
+_API_MAX_SIDE = 1024
+
+_ORIENTATION = 0x0112  # EXIF Orientation tag
+
+# Length of a stored image filename: canonical UUID plus ".jpg"
+_IMAGE_NAME_LEN = 40
+
+# Concurrent uploads whose descriptions are requested within this window are
+# sent to GPT-4o together, up to this many images per request
+_BATCH_WINDOW_S = 0.05
+_BATCH_MAX_SIZE = 8
+
+# A failed description is retried this many times in total, waiting
+# _RETRY_DELAY_S before the second attempt and doubling it after each failure
+_ANALYZE_ATTEMPTS = 3
+_RETRY_DELAY_S = 1.0
+
+# Failure reasons kept for this many of the most recent failed analyses
+_MAX_FAILURES = 1024
+
+# Failures worth retrying: an empty or malformed response, a dropped
+# connection or timeout, rate limiting and OpenAI server errors
+_TRANSIENT_ERRORS = (
+    ServiceError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+_SELECT_DESCRIPTION_SQL = "SELECT description FROM descriptions WHERE image_id = ?"
+_INSERT_DESCRIPTION_SQL = """
+    INSERT OR REPLACE INTO descriptions (image_id, description, created_at)
+    VALUES (?, ?, ?)
+"""
+
+
+async def _open_index(db_path: Path) -> aiosqlite.Connection:
+    """Open the description index, creating its table if needed."""
+    conn = await aiosqlite.connect(db_path, isolation_level=None)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS descriptions (
+            image_id TEXT PRIMARY KEY,
+            description TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+    return conn
+
+
+def _write_atomic(path: Path, data: bytes | memoryview) -> None:
+    """Write a file so readers see either nothing or the complete contents.
+
+    The data goes to a temporary sibling that is renamed into place, so a
+    crash mid-write can't leave a truncated JPEG under the final name.
+    """
+    tmp = path.with_name(f"{path.name}.tmp")
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link src to dst, copying instead where links aren't supported.
+
+    Both are atomic: a link appears complete, and a copy is made under a
+    temporary name and renamed into place.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        tmp = dst.with_name(f"{dst.name}.tmp")
+        try:
+            shutil.copyfile(src, tmp)
+            tmp.replace(dst)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+
+def _read_exif_description(path: Path) -> str | None:
+    """Read the EXIF ImageDescription from a JPEG without decoding pixels."""
+    with Image.open(path) as img:
+        description = img.getexif().get(270)  # ImageDescription tag
+    return str(description) if description is not None else None
+
 
 def _prepare_image_for_api(img: Image.Image) -> str:
     """Thumbnail an image to <=1024px and return base64-encoded JPEG."""
-    img = img.copy()
-    img.thumbnail((1024, 1024), Resampling.LANCZOS)
+    scale = _API_MAX_SIDE / max(img.size)
+    if scale < 1:
+        # resize() returns a new image, so unlike thumbnail() no full-size copy
+        # is needed to protect the caller's image. The reducing gap box-reduces
+        # by an integer factor first, then runs LANCZOS on the smaller image.
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Resampling.LANCZOS, reducing_gap=2.0)
+    # Sent over the network as base64, so smaller bytes beat faster encoding
+    return pybase64.b64encode_as_string(_encode_jpeg(img, quality=85, compact=True))
+
+
+def _encode_jpeg(
+    img: Image.Image, quality: int, *, compact: bool = False
+) -> memoryview:
+    """Encode an image to JPEG.
+
+    Args:
+        img: Image to encode.
+        quality: JPEG quality (1-95).
+        compact: Trade extra encode time for a smaller file: optimized
+            Huffman tables, progressive scans and 4:2:0 chroma subsampling.
+
+    Returns:
+        View of the encoded JPEG. It exposes the encoder's buffer directly,
+        without a copy into a new bytes object.
+    """
+    # Not preallocated: buffer growth is noise next to the encode itself, and
+    # a presized BytesIO would have to be truncated (reallocated) afterwards.
     buf = BytesIO()
-    img.save(buf, format="JPEG", quality=85)
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
+    if compact:
+        img.save(
+            buf,
+            format="JPEG",
+            quality=quality,
+            optimize=True,
+            progressive=True,
+            subsampling=2,
+        )
+    else:
+        img.save(buf, format="JPEG", quality=quality)
+    return buf.getbuffer()
+
+
+def _maybe_transpose(image: Image.Image) -> Image.Image:
+    """Apply the EXIF orientation, returning the image itself if upright.
+
+    exif_transpose() copies the whole image even when there is nothing to
+    rotate, which is the common case for web uploads and always the case for
+    images this store wrote. Reading the tag first skips that copy.
+    """
+    if image.getexif().get(_ORIENTATION, 1) == 1:
+        return image
+    transposed = ImageOps.exif_transpose(image)
+    return transposed if transposed is not None else image
+
+
+def _normalize_image(image: Image.Image) -> Image.Image:
+    """Apply the EXIF orientation and convert to RGB."""
+    img = _maybe_transpose(image)
+    if img.mode != "RGB":
+        # Pillow's converters are already tight C loops; RGBA -> RGB here is
+        # several times faster than slicing the channels through NumPy.
+        img = img.convert("RGB")
+    return img
+
+
+class _DescribeBatcher:
+    """Coalesce concurrent GPT-4o describe calls into multi-image requests.
+
+    Images arriving within `window_s` of each other, up to `max_size`, are
+    described in one request, which amortizes the round trip and prompt
+    tokens. A lone image uses the plain single-image call, and a batch whose
+    response can't be split falls back to describing each image on its own.
+    """
+
+    def __init__(
+        self,
+        client: OpenAIClient,
+        window_s: float = _BATCH_WINDOW_S,
+        max_size: int = _BATCH_MAX_SIZE,
+    ) -> None:
+        self._client = client
+        self._window_s = window_s
+        self._max_size = max_size
+        self._queue: list[tuple[str, asyncio.Future[str]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def describe(self, image_b64: str) -> str:
+        """Describe one image, possibly as part of a batch.
 
+        Args:
+            image_b64: Base64-encoded JPEG.
 
-async def _describe_image(client: OpenAIClient, img: Image.Image) -> str:
-    """Call GPT-4o vision to describe the image."""
-    b64_data = _prepare_image_for_api(img)
-    return await client.describe_image(
-        b64_data, load_prompt("describe_image"), max_tokens=800
-    )
+        Returns:
+            The GPT-4o description.
+
+        Raises:
+            ServiceError: If the description couldn't be generated.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[str] = loop.create_future()
+        self._queue.append((image_b64, future))
+        if len(self._queue) >= self._max_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_s, self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        """Send everything queued so far as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future[str]]]) -> None:
+        """Describe a batch and resolve each caller's future."""
+        images = [image_b64 for image_b64, _ in batch]
+        prompt = load_prompt("describe_image")
+        results: list[str | BaseException]
+        try:
+            try:
+                if len(images) == 1:
+                    results = [await self._client.describe_image(images[0], prompt)]
+                else:
+                    results = list(await self._client.describe_images(images, prompt))
+            except (ServiceError, openai.APIError) as e:
+                if len(images) == 1:
+                    results = [e]
+                else:
+                    log.warning(
+                        "Batch of %d descriptions failed (%s); retrying singly",
+                        len(images),
+                        e,
+                    )
+                    results = await asyncio.gather(
+                        *(
+                            self._client.describe_image(image, prompt)
+                            for image in images
+                        ),
+                        return_exceptions=True,
+                    )
+            except Exception as e:
+                # Anything else fails the whole batch for every waiting caller
+                results = [e] * len(images)
+
+            for (_, future), result in zip(batch, results, strict=True):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # If the run itself was cancelled or died, no caller may be left
+            # waiting on a future that nothing will ever resolve
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(ServiceError("Describe batch was aborted"))
 
 
 class ImageStore:
     """Store and retrieve images with GPT-4o descriptions."""
 
-    def __init__(self, settings: Settings, data_dir: Path | None = None) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        data_dir: Path | None = None,
+        openai_client: OpenAIClient | None = None,
+    ) -> None:
         """Initialize the image store.
 
         Args:
             settings: Application settings.
             data_dir: Root data directory. Defaults to PROJECT_ROOT/data/img.
+            openai_client: Optional shared OpenAI client. Created if not
+                provided, in which case the store closes it in `aclose()`.
         """
         base_dir = data_dir or (PROJECT_ROOT / "data" / "img")
+        self._index_path = base_dir / "index.db"
         self._original_dir = base_dir / "original"
         self._analyzed_dir = base_dir / "analyzed"
         self._original_dir.mkdir(parents=True, exist_ok=True)
         self._analyzed_dir.mkdir(parents=True, exist_ok=True)
-        self._client = OpenAIClient(settings.openai_api_key)
+        self._owns_client = openai_client is None
+        self._client = openai_client or OpenAIClient(settings.openai_api_key)
+        self._describer = _DescribeBatcher(self._client)
+        # Descriptions live in a small SQLite index next to the images, so
+        # storing one doesn't rewrite the JPEG and reading one doesn't parse it.
+        # It is opened by open(); aiosqlite keeps its queries off the event loop.
+        self._index: aiosqlite.Connection | None = None
+        # Background analyses by image ID; holding the tasks also keeps them
+        # from being garbage-collected mid-flight
+        self._pending: dict[UUID, asyncio.Task[None]] = {}
+        # Why each failed analysis failed, by image ID, oldest first; the
+        # original is kept but the image is never published, so requests for
+        # it can say why
+        self._failed: dict[UUID, str] = {}
+        # Index of analyzed images, scanned once here and kept current by
+        # put_image, so picking a random image doesn't list the directory.
+        self._image_ids = self._list_images()
+
+        # All JPEG work goes through Pillow, which is only fast (SIMD DCT and
+        # Huffman coding) when built against libjpeg-turbo, as its wheels are.
+        # Encoding through Pillow directly is faster than handing a NumPy copy
+        # of the pixels to a separate TurboJPEG binding.
+        if not features.check_feature("libjpeg_turbo"):
+            log.warning(
+                "Pillow is not built with libjpeg-turbo; JPEG encoding will be slow"
+            )
+
+    async def open(self) -> None:
+        """Open the description index, creating it if needed."""
+        self._index = await _open_index(self._index_path)
+        log.info("image index initialized at %s", self._index_path)
+
+    def _index_conn(self) -> aiosqlite.Connection:
+        if self._index is None:
+            raise RuntimeError("ImageStore is not open")
+        return self._index
 
     async def put_image(self, image: Image.Image) -> UUID:
-        """Store an image, analyze it with GPT-4o, and save with description.
+        """Store an image and start analyzing it with GPT-4o.
+
+        Only the original is saved before returning. The GPT-4o description
+        takes seconds, so it runs as a background task; until it finishes the
+        image is pending and not yet served or transformable.
 
         Args:
-            image: PIL Image to store.
+            image: PIL Image to store. An upright RGB image is used as-is by
+                the background analysis, so it must not be modified or closed
+                until that finishes.
 
         Returns:
             UUID identifying the stored image.
         """
         image_id = uuid.uuid4()
 
-        # Normalize image
-        img = ImageOps.exif_transpose(image)
-        if img is None:
-            img = image
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-
-        # Save original
+        # Normalize and save original. Pillow releases the GIL while coding,
+        # so this runs on a worker thread and leaves the event loop free.
+        img = await anyio.to_thread.run_sync(_normalize_image, image)
+        jpeg = await anyio.to_thread.run_sync(_encode_jpeg, img, 95)
         original_path = self._original_dir / f"{image_id}.jpg"
-        img.save(original_path, format="JPEG", quality=95)
+        await anyio.to_thread.run_sync(_write_atomic, original_path, jpeg)
         log.info("Saved original: %s", original_path.name)
 
-        # Get description from GPT
-        description = await _describe_image(self._client, img)
-        log.info("Got description (%d chars)", len(description))
+        task = asyncio.create_task(self._analyze(image_id, img))
+        self._pending[image_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(image_id, None))
+        return image_id
 
-        # Save analyzed with description in EXIF
-        analyzed_path = self._analyzed_dir / f"{image_id}.jpg"
-        exif = Image.Exif()
-        exif[270] = description  # ImageDescription tag
-        img.save(analyzed_path, format="JPEG", quality=95, exif=exif.tobytes())
+    async def _analyze(self, image_id: UUID, img: Image.Image) -> None:
+        """Describe a stored original with GPT-4o and publish it as analyzed.
+
+        Any failure, including while publishing, is logged and recorded in
+        `_failed` instead of escaping the background task. The recorded
+        reason is sent to clients, so it names only the failed step and the
+        exception type, never the message (which can include server paths).
+        """
+        step = "Describing the image failed"
+        try:
+            b64_data = await anyio.to_thread.run_sync(_prepare_image_for_api, img)
+            description = await self._describe_with_retry(b64_data)
+            log.info("Got description (%d chars)", len(description))
+
+            step = "Saving the analyzed image failed"
+
+            # Record the description, then publish the analyzed image as a link
+            # to the original: the pixels are identical, so nothing is re-encoded
+            await self._index_conn().execute(
+                _INSERT_DESCRIPTION_SQL,
+                (str(image_id), description, datetime.now(UTC).isoformat()),
+            )
+            original_path = self._original_dir / f"{image_id}.jpg"
+            analyzed_path = self._analyzed_dir / f"{image_id}.jpg"
+            await anyio.to_thread.run_sync(_link_or_copy, original_path, analyzed_path)
+        except Exception as e:
+            log.exception("Failed to analyze image %s", image_id)
+            self._failed[image_id] = f"{step} ({type(e).__name__})"
+            if len(self._failed) > _MAX_FAILURES:
+                del self._failed[next(iter(self._failed))]
+            return
         log.info("Saved analyzed: %s", analyzed_path.name)
+        self._image_ids.append(image_id)
 
-        return image_id
+    async def _describe_with_retry(self, image_b64: str) -> str:
+        """Describe an image, retrying transient failures with backoff."""
+        delay = _RETRY_DELAY_S
+        for attempt in range(1, _ANALYZE_ATTEMPTS):
+            try:
+                return await self._describer.describe(image_b64)
+            except _TRANSIENT_ERRORS as e:
+                log.warning(
+                    "Describe attempt %d/%d failed (%s); retrying in %.1fs",
+                    attempt,
+                    _ANALYZE_ATTEMPTS,
+                    e,
+                    delay,
+                )
+            await anyio.sleep(delay)
+            delay *= 2
+        return await self._describer.describe(image_b64)
+
+    def is_pending(self, image_id: UUID) -> bool:
+        """Check whether an image is stored but still being analyzed.
+
+        Args:
+            image_id: UUID of the image.
+
+        Returns:
+            True if the GPT-4o analysis of the image hasn't finished yet.
+        """
+        return image_id in self._pending
+
+    def get_failure(self, image_id: UUID) -> str | None:
+        """Get why the GPT-4o analysis of an image failed.
+
+        Args:
+            image_id: UUID of the image.
+
+        Returns:
+            The failure reason, or None if the analysis didn't fail.
+        """
+        return self._failed.get(image_id)
+
+    async def flush(self) -> None:
+        """Wait until every pending analysis has finished."""
+        while self._pending:
+            await asyncio.wait(list(self._pending.values()))
+
+    async def put_image_bytes(self, data: bytes | BinaryIO) -> UUID:
+        """Store an encoded image file and start analyzing it with GPT-4o.
+
+        Args:
+            data: Encoded image file (JPEG, PNG, ...), as bytes or as a binary
+                file positioned at its start. A file is read in place rather
+                than copied.
+
+        Returns:
+            UUID identifying the stored image.
+        """
+        source = BytesIO(data) if isinstance(data, bytes) else data
+        with Image.open(source) as image:
+            return await self.put_image(image)
 
     def _list_images(self) -> list[UUID]:
-        """List all analyzed image UUIDs.
+        """List all analyzed image UUIDs on disk.
 
         Returns:
             List of UUIDs for all analyzed images.
         """
         uuids = []
-        for path in self._analyzed_dir.glob("*.jpg"):
-            try:
-                uuids.append(uuid.UUID(path.stem))
-            except ValueError:
-                continue
+        # scandir yields names without stat'ing each entry, and the length
+        # check (36-char UUID + ".jpg") rejects most stray files before parsing
+        with os.scandir(self._analyzed_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if len(name) != _IMAGE_NAME_LEN or not name.endswith(".jpg"):
+                    continue
+                try:
+                    uuids.append(uuid.UUID(name[:-4]))
+                except ValueError:
+                    continue
         return uuids
 
-    def get_random_image(self) -> tuple[UUID, Image.Image] | None:
-        """Get a random analyzed image.
+    def _choose_random_image(self) -> UUID | None:
+        """Pick a random analyzed image UUID, or None if there are none."""
+        if not self._image_ids:
+            return None
+        # Not security-sensitive: random selection for user display, not crypto
+        return random.choice(self._image_ids)  # noqa: S311
+
+    async def get_description(self, image_id: UUID) -> str | None:
+        """Get the stored GPT-4o description of an image.
+
+        Images analyzed before the index existed carry their description in
+        the EXIF ImageDescription tag instead, which is used as a fallback.
+
+        Args:
+            image_id: UUID of the image.
 
         Returns:
-            Tuple of (image_id, PIL Image), or None if no images exist.
+            The description, or None if the image has none.
         """
-        images = self._list_images()
-        if not images:
+        async with self._index_conn().execute(
+            _SELECT_DESCRIPTION_SQL, (str(image_id),)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is not None:
+            return str(row[0])
+
+        path = self._analyzed_dir / f"{image_id}.jpg"
+        if not path.exists():
             return None
-        # Not security-sensitive: random selection for user display, not crypto
-        image_id = random.choice(images)  # noqa: S311
+        return await anyio.to_thread.run_sync(_read_exif_description, path)
+
+    async def aclose(self) -> None:
+        """Finish pending analyses, then close the index and owned client."""
+        await self.flush()
+        if self._index is not None:
+            await self._index.close()
+            self._index = None
+        if self._owns_client:
+            await self._client.aclose()
+
+    def get_random_image_path(self) -> tuple[UUID, Path] | None:
+        """Get the file path of a random analyzed image.
 
-        analyzed_path = self._analyzed_dir / f"{image_id}.jpg"
-        with Image.open(analyzed_path) as raw_img:
-            transposed = ImageOps.exif_transpose(raw_img)
-            img: Image.Image = transposed if transposed is not None else raw_img.copy()
+        Analyzed images are stored already oriented, so the file can be served
+        as-is without decoding.
 
-        return image_id, img
+        Returns:
+            Tuple of (image_id, path to the JPEG file), or None if no images exist.
+        """
+        image_id = self._choose_random_image()
+        if image_id is None:
+            return None
+        return image_id, self._analyzed_dir / f"{image_id}.jpg"
 
     def get_image_path(self, image_id: UUID) -> Path:
         """Get path to analyzed image file.
@@ -1,14 +1,18 @@
 """Prompt loading utilities."""
 
-from functools import cache
-
 __all__ = ["load_prompt"]
 from pathlib import Path
 
 _PROMPTS_DIR = Path(__file__).parent
 
+# Prompts are static package files, so read them all once at import and keep
+# file I/O off the request path entirely.
+_PROMPTS: dict[str, str] = {
+    path.stem: path.read_text(encoding="utf-8").strip()
+    for path in _PROMPTS_DIR.glob("*.txt")
+}
+
 
-@cache
 def load_prompt(name: str) -> str:
     """Load a prompt from the prompts directory.
 
@@ -21,5 +25,7 @@ def load_prompt(name: str) -> str:
     Raises:
         FileNotFoundError: If the prompt file doesn't exist.
     """
-    prompt_path = _PROMPTS_DIR / f"{name}.txt"
-    return prompt_path.read_text().strip()
+    try:
+        return _PROMPTS[name]
+    except KeyError:
+        raise FileNotFoundError(f"Prompt not found: {name}") from None
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import sys
 from contextlib import asynccontextmanager
 from typing import TYPE_CHECKING
 
@@ -11,7 +12,9 @@ from fastapi import FastAPI
 from local_shazam.aesthetic_cache import AestheticCache
 from local_shazam.api.routes import router as http_router
 from local_shazam.config import Settings
+from local_shazam.flux2_client import Flux2Client
 from local_shazam.logger import get_logger, setup_root_logger
+from local_shazam.openai_client import OpenAIClient
 from local_shazam.process_images import ImageStore
 
 if TYPE_CHECKING:
@@ -42,13 +45,23 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     log.info("Initializing server...")
     app.state.settings = settings
-    app.state.image_store = ImageStore(settings)
+    # One OpenAI client (and connection pool) shared by uploads and transforms
+    app.state.openai_client = OpenAIClient(settings.openai_api_key)
+    app.state.image_store = ImageStore(settings, openai_client=app.state.openai_client)
+    await app.state.image_store.open()
     app.state.aesthetic_cache = AestheticCache()
+    await app.state.aesthetic_cache.open()
+    app.state.flux_client = Flux2Client(settings.bfl_api_key)
     log.info("Server initialized")
 
     yield
 
     log.info("Server shutting down")
+    # The image store first: its pending analyses still use the OpenAI client
+    await app.state.image_store.aclose()
+    await app.state.openai_client.aclose()
+    await app.state.flux_client.aclose()
+    await app.state.aesthetic_cache.close()
 
 
 def create_app() -> FastAPI:
@@ -73,6 +86,11 @@ def main() -> None:
         host=settings.server_host,
         port=settings.server_port,
         log_level=settings.log_level.lower(),
+        # Both come with uvicorn[standard]; naming them makes a missing install
+        # fail at startup instead of silently falling back to asyncio and h11.
+        # uvloop has no Windows build.
+        loop="asyncio" if sys.platform in ("win32", "cygwin") else "uvloop",
+        http="httptools",
     )
 
 
@@ -1,6 +1,30 @@
 """Tests for local_shazam."""
 
+import asyncio
+import gc
+import sqlite3
+import uuid
+from collections.abc import AsyncIterator
+from io import BytesIO
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+import respx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+from PIL.ExifTags import GPS, IFD
+from starlette.datastructures import UploadFile
+
+from local_shazam.aesthetic_cache import _SELECT_SQL, AestheticCache
+from local_shazam.api.routes import router
+from local_shazam.config import Settings
 from local_shazam.exceptions import LocalShazamError, ServiceError
+from local_shazam.flux2_client import Flux2Client, _retry_after
+from local_shazam.image_transformer import _extract_image_metadata
+from local_shazam.process_images import ImageStore, _DescribeBatcher
 
 
 class TestExceptionHierarchy:
@@ -11,3 +35,638 @@ class TestExceptionHierarchy:
 
     def test_base_error_inherits_from_exception(self) -> None:
         assert issubclass(LocalShazamError, Exception)
+
+
+class TestAestheticCache:
+    """Tests for the SQLite aesthetic cache."""
+
+    async def test_put_then_get_round_trips(self, tmp_path: Path) -> None:
+        async with AestheticCache(tmp_path / "cache.db") as cache:
+            await cache.put("Daft Punk", "One More Time", "neon")
+            await cache.flush()
+            assert await cache.get("daft punk ", " ONE MORE TIME") == "neon"
+
+    async def test_get_missing_returns_none(self, tmp_path: Path) -> None:
+        async with AestheticCache(tmp_path / "cache.db") as cache:
+            assert await cache.get("Nobody", "Nothing") is None
+
+    async def test_concurrent_reads_and_writes(self, tmp_path: Path) -> None:
+        async with AestheticCache(tmp_path / "cache.db", read_pool_size=2) as cache:
+            await asyncio.gather(
+                *(cache.put("artist", f"song {i}", f"desc {i}") for i in range(10))
+            )
+            await cache.flush()
+            results = await asyncio.gather(
+                *(cache.get("artist", f"song {i}") for i in range(10))
+            )
+        assert results == [f"desc {i}" for i in range(10)]
+
+    async def test_concurrent_misses_share_one_fetch(self, tmp_path: Path) -> None:
+        calls = 0
+
+        async def fetch() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "neon"
+
+        async with AestheticCache(tmp_path / "cache.db") as cache:
+            results = await asyncio.gather(
+                *(cache.get_or_fetch("artist", "song", fetch) for _ in range(5))
+            )
+            await cache.flush()
+            assert await cache.get("artist", "song") == "neon"
+
+        assert results == ["neon"] * 5
+        assert calls == 1
+
+    async def test_failed_fetch_after_cancel_is_retrieved(self, tmp_path: Path) -> None:
+        errors: list[dict[str, object]] = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda _, context: errors.append(context)
+        )
+        started = asyncio.Event()
+
+        async def fetch() -> str:
+            started.set()
+            await asyncio.sleep(0.01)
+            raise ServiceError("boom")
+
+        async with AestheticCache(tmp_path / "cache.db") as cache:
+            caller = asyncio.create_task(cache.get_or_fetch("artist", "song", fetch))
+            await started.wait()
+            (lookup,) = cache._inflight.values()
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+            await asyncio.wait([lookup])
+            del lookup
+        gc.collect()
+
+        assert errors == []
+
+    async def test_fetch_result_can_skip_caching(self, tmp_path: Path) -> None:
+        async def fetch() -> str:
+            return "nothing"
+
+        async with AestheticCache(tmp_path / "cache.db") as cache:
+            result = await cache.get_or_fetch(
+                "artist", "song", fetch, should_cache=lambda _: False
+            )
+            await cache.flush()
+            assert result == "nothing"
+            assert await cache.get("artist", "song") is None
+
+    async def test_memory_lru_evicts_oldest(self, tmp_path: Path) -> None:
+        async with AestheticCache(tmp_path / "cache.db", memory_size=2) as cache:
+            for song in ("a", "b", "c"):
+                await cache.put("artist", song, f"desc {song}")
+            assert list(cache._memory) == [("artist", "b"), ("artist", "c")]
+            await cache.flush()
+            assert await cache.get("artist", "a") == "desc a"
+            assert list(cache._memory) == [("artist", "c"), ("artist", "a")]
+
+    async def test_close_commits_queued_writes(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "cache.db"
+        async with AestheticCache(db_path) as cache:
+            await cache.put("artist", "song", "desc")
+        async with AestheticCache(db_path) as cache:
+            assert await cache.get("artist", "song") == "desc"
+
+    async def test_checkpoint_truncates_wal(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "cache.db"
+        async with AestheticCache(db_path) as cache:
+            await cache.put("artist", "song", "desc")
+            await cache.flush()
+            assert await cache.checkpoint() == (0, 0, 0)
+            assert (tmp_path / "cache.db-wal").stat().st_size == 0
+
+    async def test_lookup_uses_primary_key_index(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "cache.db"
+        async with AestheticCache(db_path):
+            pass
+        with sqlite3.connect(db_path) as conn:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {_SELECT_SQL}", ("a", "s"))
+            (detail,) = [row[3] for row in plan]
+        assert detail.startswith("SEARCH aesthetics USING INDEX")
+        assert "(artist=? AND song=?)" in detail
+
+    async def test_uses_wal_journal(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "cache.db"
+        async with AestheticCache(db_path):
+            pass
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+class TestFlux2Client:
+    """Tests for the BFL Flux.2 client."""
+
+    @respx.mock
+    async def test_generate_image_polls_until_ready(self) -> None:
+        respx.post("https://api.bfl.ai/v1/flux-2-klein-9b").respond(
+            json={"polling_url": "https://api.bfl.ai/v1/get_result?id=1"}
+        )
+        respx.get("https://api.bfl.ai/v1/get_result?id=1").mock(
+            side_effect=[
+                httpx.Response(200, json={"status": "Pending"}),
+                httpx.Response(
+                    200,
+                    json={
+                        "status": "Ready",
+                        "result": {"sample": "https://delivery.bfl.ai/out.png"},
+                    },
+                ),
+            ]
+        )
+        respx.get("https://delivery.bfl.ai/out.png").respond(content=b"png-bytes")
+
+        async with Flux2Client("key") as client:
+            assert await client.generate_image("prompt", "b64") == b"png-bytes"
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            (None, None),
+            ("5", 5.0),
+            ("0.5", 0.5),
+            ("3600", 120.0),
+            ("nan", None),
+            ("inf", None),
+            ("-1", None),
+            ("Wed, 21 Oct 2015 07:28:00 GMT", None),
+        ],
+    )
+    def test_retry_after_parsing(
+        self, header: str | None, expected: float | None
+    ) -> None:
+        headers = {"Retry-After": header} if header is not None else {}
+        assert _retry_after(httpx.Response(200, headers=headers)) == expected
+
+    @respx.mock
+    async def test_poll_backs_off_and_honours_retry_after(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        delays: list[float] = []
+
+        async def fake_sleep(seconds: float) -> None:
+            delays.append(seconds)
+
+        monkeypatch.setattr("local_shazam.flux2_client.anyio.sleep", fake_sleep)
+        pending = {"status": "Pending"}
+        respx.get("https://api.bfl.ai/v1/get_result?id=1").mock(
+            side_effect=[
+                httpx.Response(200, json=pending),
+                httpx.Response(200, json=pending, headers={"Retry-After": "5"}),
+                # Asking to poll again at once doesn't cut the backoff short
+                httpx.Response(200, json=pending, headers={"Retry-After": "0"}),
+                httpx.Response(200, json=pending, headers={"Retry-After": "nan"}),
+                httpx.Response(200, json=pending),
+                httpx.Response(
+                    200, json={"status": "Ready", "result": {"sample": "url"}}
+                ),
+            ]
+        )
+
+        async with Flux2Client("key") as client:
+            url = await client._poll_for_result("https://api.bfl.ai/v1/get_result?id=1")
+
+        assert url == "url"
+        assert delays == pytest.approx([0.1, 5.0, 0.225, 0.3375, 0.50625])
+
+    @respx.mock
+    async def test_generate_image_reports_missing_credits(self) -> None:
+        respx.post("https://api.bfl.ai/v1/flux-2-klein-9b").respond(status_code=402)
+
+        async with Flux2Client("key") as client:
+            with pytest.raises(ServiceError, match="credits"):
+                await client.generate_image("prompt", "b64")
+
+
+def _jpeg_bytes(exif: Image.Exif | None = None) -> bytes:
+    buf = BytesIO()
+    Image.new("RGB", (8, 8)).save(
+        buf, format="JPEG", exif=exif.tobytes() if exif else b""
+    )
+    return buf.getvalue()
+
+
+class TestExtractImageMetadata:
+    """Tests for EXIF metadata extraction."""
+
+    def test_reads_description_and_gps(self) -> None:
+        exif = Image.Exif()
+        exif[270] = "a dog on a beach"
+        gps = exif.get_ifd(IFD.GPSInfo)
+        gps[GPS.GPSLatitudeRef] = "N"
+        gps[GPS.GPSLatitude] = (40.0, 30.0, 0.0)
+        gps[GPS.GPSLongitudeRef] = "W"
+        gps[GPS.GPSLongitude] = (73.0, 59.0, 24.0)
+
+        metadata = _extract_image_metadata(_jpeg_bytes(exif))
+
+        assert metadata["description"] == "a dog on a beach"
+        assert metadata["gps_coords"] == "40.500000, -73.990000"
+        assert metadata["datetime"] is None
+
+    def test_image_without_exif_has_no_metadata(self) -> None:
+        metadata = _extract_image_metadata(_jpeg_bytes())
+        assert set(metadata.values()) == {None}
+
+
+class _FakeOpenAIClient:
+    """Stands in for OpenAIClient.describe_image and describe_images.
+
+    Errors queued in `failures` are raised by the next describe_image calls,
+    and `batch_failure`, if set, by every describe_images call.
+    """
+
+    def __init__(self) -> None:
+        self.images: list[str] = []
+        self.batches: list[int] = []
+        self.failures: list[Exception] = []
+        self.batch_failure: Exception | None = None
+
+    async def describe_image(self, image_b64: str, *_: object, **__: object) -> str:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.images.append(image_b64)
+        return f"description {len(self.images)}"
+
+    async def describe_images(
+        self, images_b64: list[str], *_: object, **__: object
+    ) -> list[str]:
+        self.batches.append(len(images_b64))
+        if self.batch_failure is not None:
+            raise self.batch_failure
+        return [await self.describe_image(image) for image in images_b64]
+
+
+@pytest.fixture
+async def image_store(tmp_path: Path) -> AsyncIterator[ImageStore]:
+    store = ImageStore(
+        Settings(openai_api_key="test"),
+        data_dir=tmp_path,
+        openai_client=_FakeOpenAIClient(),  # type: ignore[arg-type]
+    )
+    await store.open()
+    yield store
+    await store.aclose()
+
+
+class TestImageStore:
+    """Tests for storing and retrieving analyzed images."""
+
+    async def test_put_image_bytes_saves_analyzed_image(
+        self, image_store: ImageStore
+    ) -> None:
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        assert image_store.is_pending(image_id)
+        assert image_store.get_random_image_path() is None
+
+        await image_store.flush()
+
+        assert not image_store.is_pending(image_id)
+        path = image_store.get_image_path(image_id)
+        assert await image_store.get_description(image_id) == "description 1"
+        assert image_store.get_random_image_path() == (image_id, path)
+
+    async def test_concurrent_uploads_share_one_describe_request(
+        self, image_store: ImageStore
+    ) -> None:
+        image_ids = await asyncio.gather(
+            *(image_store.put_image_bytes(_jpeg_bytes()) for _ in range(3))
+        )
+        await image_store.flush()
+
+        assert image_store._client.batches == [3]  # type: ignore[attr-defined]
+        descriptions = {await image_store.get_description(i) for i in image_ids}
+        assert descriptions == {"description 1", "description 2", "description 3"}
+
+    async def test_analyzed_image_links_to_original(
+        self, image_store: ImageStore, tmp_path: Path
+    ) -> None:
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        original = tmp_path / "original" / f"{image_id}.jpg"
+        assert image_store.get_image_path(image_id).samefile(original)
+        assert not original.with_name(f"{original.name}.tmp").exists()
+
+    async def test_description_falls_back_to_exif(
+        self, image_store: ImageStore, tmp_path: Path
+    ) -> None:
+        exif = Image.Exif()
+        exif[270] = "legacy description"
+        image_id = uuid.uuid4()
+        (tmp_path / "analyzed" / f"{image_id}.jpg").write_bytes(_jpeg_bytes(exif))
+
+        assert await image_store.get_description(image_id) == "legacy description"
+        assert await image_store.get_description(uuid.uuid4()) is None
+
+    async def test_upload_is_stored_upright(self, image_store: ImageStore) -> None:
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise
+        buf = BytesIO()
+        Image.new("RGB", (16, 8)).save(buf, format="JPEG", exif=exif.tobytes())
+
+        image_id = await image_store.put_image_bytes(buf.getvalue())
+        await image_store.flush()
+
+        with Image.open(image_store.get_image_path(image_id)) as img:
+            assert img.size == (8, 16)
+
+    async def test_index_is_loaded_from_disk(
+        self, image_store: ImageStore, tmp_path: Path
+    ) -> None:
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+        (tmp_path / "analyzed" / "not-a-uuid.jpg").write_bytes(b"")
+
+        reopened = ImageStore(Settings(openai_api_key="test"), data_dir=tmp_path)
+        await reopened.open()
+
+        assert reopened._image_ids == [image_id]
+        assert await reopened.get_description(image_id) == "description 1"
+        await reopened.aclose()
+
+    async def test_empty_store_has_no_random_image(
+        self, image_store: ImageStore
+    ) -> None:
+        assert image_store.get_random_image_path() is None
+
+    async def test_transient_describe_failure_is_retried(
+        self, image_store: ImageStore, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("local_shazam.process_images._RETRY_DELAY_S", 0)
+        image_store._client.failures = [ServiceError("empty")]  # type: ignore[attr-defined]
+
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        assert image_store.get_failure(image_id) is None
+        assert await image_store.get_description(image_id) == "description 1"
+
+    async def test_failed_analysis_is_recorded(
+        self, image_store: ImageStore, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("local_shazam.process_images._RETRY_DELAY_S", 0)
+        image_store._client.failures = [ServiceError("empty")] * 3  # type: ignore[attr-defined]
+
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        assert not image_store.is_pending(image_id)
+        assert (
+            image_store.get_failure(image_id)
+            == "Describing the image failed (ServiceError)"
+        )
+        assert image_store.get_random_image_path() is None
+        with pytest.raises(FileNotFoundError):
+            image_store.get_image_path(image_id)
+
+    async def test_only_recent_failures_are_kept(
+        self, image_store: ImageStore, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("local_shazam.process_images._RETRY_DELAY_S", 0)
+        monkeypatch.setattr("local_shazam.process_images._MAX_FAILURES", 2)
+        image_store._client.failures = [ServiceError("empty")] * 9  # type: ignore[attr-defined]
+
+        image_ids = []
+        for _ in range(3):
+            image_ids.append(await image_store.put_image_bytes(_jpeg_bytes()))
+            await image_store.flush()
+
+        assert image_store.get_failure(image_ids[0]) is None
+        assert image_store.get_failure(image_ids[1]) is not None
+        assert image_store.get_failure(image_ids[2]) is not None
+
+    async def test_failed_publish_is_recorded(
+        self, image_store: ImageStore, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        def fail_link(*_: object) -> None:
+            raise OSError("disk full")
+
+        monkeypatch.setattr("local_shazam.process_images._link_or_copy", fail_link)
+
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        assert (
+            image_store.get_failure(image_id)
+            == "Saving the analyzed image failed (OSError)"
+        )
+        assert image_store.get_random_image_path() is None
+
+
+class TestDescribeBatcher:
+    """Tests for coalescing describe calls."""
+
+    async def test_lone_image_uses_single_image_call(self) -> None:
+        client = _FakeOpenAIClient()
+        batcher = _DescribeBatcher(client, window_s=0)  # type: ignore[arg-type]
+
+        assert await batcher.describe("a") == "description 1"
+        assert client.batches == []
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            ServiceError("GPT-4o returned a malformed batch for 2 images"),
+            openai.APIConnectionError(
+                request=httpx.Request("POST", "https://api.openai.com/v1")
+            ),
+        ],
+    )
+    async def test_failed_batch_falls_back_to_single_calls(
+        self, error: Exception
+    ) -> None:
+        client = _FakeOpenAIClient()
+        client.batch_failure = error
+        batcher = _DescribeBatcher(client, window_s=0)  # type: ignore[arg-type]
+
+        results = await asyncio.gather(batcher.describe("a"), batcher.describe("b"))
+
+        assert client.batches == [2]
+        assert client.images == ["a", "b"]
+        assert sorted(results) == ["description 1", "description 2"]
+
+    async def test_aborted_batch_fails_waiting_callers(self) -> None:
+        client = _FakeOpenAIClient()
+        started = asyncio.Event()
+
+        async def hang(*_: object, **__: object) -> str:
+            started.set()
+            await asyncio.Future()
+            raise AssertionError
+
+        client.describe_image = hang  # type: ignore[method-assign]
+        batcher = _DescribeBatcher(client, window_s=0)  # type: ignore[arg-type]
+        waiter = asyncio.create_task(batcher.describe("a"))
+        await started.wait()
+
+        for task in batcher._tasks:
+            task.cancel()
+
+        with pytest.raises(ServiceError, match="aborted"):
+            await asyncio.wait_for(waiter, timeout=1)
+
+
+class TestRandomImageEndpoint:
+    """Tests for GET /images."""
+
+    @pytest.fixture
+    def client(self, image_store: ImageStore) -> TestClient:
+        app = FastAPI()
+        app.include_router(router)
+        app.state.image_store = image_store
+        return TestClient(app)
+
+    async def test_returns_stored_jpeg_with_etag(
+        self, image_store: ImageStore, client: TestClient
+    ) -> None:
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        response = client.get("/images")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        assert response.headers["x-image-id"] == str(image_id)
+        assert response.headers["etag"] == f'"{image_id}"'
+        assert response.content == image_store.get_image_path(image_id).read_bytes()
+
+    async def test_matching_if_none_match_returns_304(
+        self, image_store: ImageStore, client: TestClient
+    ) -> None:
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        response = client.get("/images", headers={"If-None-Match": str(image_id)})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["x-image-id"] == str(image_id)
+
+    async def test_wildcard_if_none_match_returns_304(
+        self, image_store: ImageStore, client: TestClient
+    ) -> None:
+        await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        response = client.get("/images", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 304
+
+    async def test_other_if_none_match_returns_image(
+        self, image_store: ImageStore, client: TestClient
+    ) -> None:
+        await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        response = client.get(
+            "/images", headers={"If-None-Match": f'W/"{uuid.uuid4()}"'}
+        )
+
+        assert response.status_code == 200
+
+    def test_empty_store_returns_404(self, client: TestClient) -> None:
+        assert client.get("/images").status_code == 404
+
+
+class TestUploadEndpoint:
+    """Tests for PUT /images."""
+
+    @pytest.fixture
+    def client(self, image_store: ImageStore) -> TestClient:
+        app = FastAPI()
+        app.include_router(router)
+        app.state.image_store = image_store
+        return TestClient(app)
+
+    @staticmethod
+    def _upload(client: TestClient, data: bytes) -> httpx.Response:
+        return client.put("/images", files={"file": ("a.jpg", data, "image/jpeg")})
+
+    def test_oversized_upload_returns_413(
+        self, client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("local_shazam.api.routes._MAX_UPLOAD_SIZE", 1024)
+        monkeypatch.setattr("local_shazam.api.routes._UPLOAD_CHUNK_SIZE", 256)
+        read = 0
+        original_read = UploadFile.read
+
+        async def counting_read(self: UploadFile, size: int = -1) -> bytes:
+            nonlocal read
+            chunk = await original_read(self, size)
+            read += len(chunk)
+            return chunk
+
+        monkeypatch.setattr(UploadFile, "read", counting_read)
+
+        response = self._upload(client, b"\xff" * 4096)
+
+        assert response.status_code == 413
+        # Rejected as soon as the limit is crossed, not after reading it all
+        assert 1024 < read <= 1024 + 256
+        assert not any((tmp_path / "original").iterdir())
+
+    def test_non_image_returns_400(self, client: TestClient, tmp_path: Path) -> None:
+        response = self._upload(client, b"not an image")
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Invalid image:")
+        assert not any((tmp_path / "original").iterdir())
+
+    def test_truncated_image_returns_400(self, client: TestClient) -> None:
+        buf = BytesIO()
+        Image.effect_noise((64, 64), 64).convert("RGB").save(buf, format="JPEG")
+        # Headers intact, so verify() passes; the pixel data is cut short
+        truncated = buf.getvalue()[: len(buf.getvalue()) // 2]
+
+        response = self._upload(client, truncated)
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Invalid image:")
+
+
+class TestTransformEndpoint:
+    """Tests for POST /images."""
+
+    @pytest.fixture
+    def client(self, image_store: ImageStore) -> TestClient:
+        app = FastAPI()
+        app.include_router(router)
+        app.state.image_store = image_store
+        # Only reached once the image is found, which these tests never do
+        app.state.settings = app.state.aesthetic_cache = None
+        app.state.flux_client = app.state.openai_client = None
+        return TestClient(app)
+
+    @staticmethod
+    def _transform(client: TestClient, image_id: uuid.UUID) -> httpx.Response:
+        return client.post(
+            "/images",
+            params={"image_id": str(image_id), "song_title": "s", "song_artists": "a"},
+        )
+
+    async def test_failed_analysis_returns_502(
+        self,
+        image_store: ImageStore,
+        client: TestClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr("local_shazam.process_images._RETRY_DELAY_S", 0)
+        image_store._client.failures = [ServiceError("empty")] * 3  # type: ignore[attr-defined]
+        image_id = await image_store.put_image_bytes(_jpeg_bytes())
+        await image_store.flush()
+
+        response = self._transform(client, image_id)
+
+        assert response.status_code == 502
+        assert response.json()["detail"] == (
+            "Image analysis failed: Describing the image failed (ServiceError)"
+        )
+
+    def test_unknown_image_returns_404(self, client: TestClient) -> None:
+        assert self._transform(client, uuid.uuid4()).status_code == 404